@@ -1,4 +1,4 @@
 from .data import Data
 from .cop_data import CoPData
 from .data_reader import DataReader
-from .helpers import concatenate_data
+from .helpers import concatenate_data, pearson_r
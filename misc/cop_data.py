@@ -1,8 +1,10 @@
+from functools import cached_property
+
 import numpy as np
 from matplotlib import pyplot as plt
 
 from .data import Data
-from .helpers import derivative, integral
+from .helpers import derivative, segments_integral, segments_range
 
 
 class CoPData(Data):
@@ -28,69 +30,52 @@ class CoPData(Data):
 
         return CoPData(super().concatenate(other))
 
-    @property
-    def displacement_integral(self) -> tuple[float, ...]:
+    @cached_property
+    def displacement_integral(self) -> np.ndarray:
         """
         Get the horizontal displacement integral in the mat
         """
-        return tuple(
-            integral(self.t[l:t], self.displacement[l:t])
-            for t, l in zip(self.takeoffs_indices[1:], self.landings_indices[0:-1])
-        )
+        return segments_integral(self.t, self.displacement, self._mat_starts, self._mat_ends, self._half_time_steps)
 
-    @property
-    def displacement_ranges(self) -> tuple[float, ...]:
+    @cached_property
+    def displacement_ranges(self) -> np.ndarray:
         """
         Get the horizontal range
         """
-        return tuple(
-            np.nanmax(self.displacement[l:t]) - np.nanmin(self.displacement[l:t])
-            for t, l in zip(self.takeoffs_indices[1:], self.landings_indices[0:-1])
-        )
+        return segments_range(self.displacement, self._mat_starts, self._mat_ends)
 
-    @property
-    def velocity_integral(self) -> tuple[float, ...]:
+    @cached_property
+    def velocity_integral(self) -> np.ndarray:
         """
         Get the horizontal impulses in the mat
         """
-        return tuple(
-            integral(self.t[l:t], self.velocity[l:t])
-            for t, l in zip(self.takeoffs_indices[1:], self.landings_indices[0:-1])
-        )
+        return segments_integral(self.t, self.velocity, self._mat_starts, self._mat_ends, self._half_time_steps)
 
-    @property
-    def velocity_ranges(self) -> tuple[float, ...]:
+    @cached_property
+    def velocity_ranges(self) -> np.ndarray:
         """
         Get the horizontal range
         """
-        return tuple(
-            np.nanmax(self.velocity[l:t]) - np.nanmin(self.velocity[l:t])
-            for t, l in zip(self.takeoffs_indices[1:], self.landings_indices[0:-1])
-        )
+        return segments_range(self.velocity, self._mat_starts, self._mat_ends)
 
-    @property
-    def acceleration_integral(self) -> tuple[float, ...]:
+    @cached_property
+    def acceleration_integral(self) -> np.ndarray:
         """
         Get the horizontal acceleration integral in the mat
         """
-        return tuple(
-            integral(self.t[l:t], self.acceleration[l:t])
-            for t, l in zip(self.takeoffs_indices[1:], self.landings_indices[0:-1])
-        )
+        return segments_integral(self.t, self.acceleration, self._mat_starts, self._mat_ends, self._half_time_steps)
 
-    @property
-    def acceleration_ranges(self) -> tuple[float, ...]:
+    @cached_property
+    def acceleration_ranges(self) -> np.ndarray:
         """
         Get the horizontal range
         """
-        return tuple(
-            np.nanmax(self.acceleration[l:t]) - np.nanmin(self.acceleration[l:t])
-            for t, l in zip(self.takeoffs_indices[1:], self.landings_indices[0:-1])
-        )
+        return segments_range(self.acceleration, self._mat_starts, self._mat_ends)
 
     def plot(
         self,
         override_y: np.ndarray = None,
+        max_points: int = 10000,
         **figure_options,
     ) -> plt.figure:
         """
@@ -100,6 +85,9 @@ class CoPData(Data):
         ----------
         override_y
             Force to plot this y data instead of the self.y attribute
+        max_points
+            The number of points above which the data are downsampled for the drawing (see _downsample_indices). If
+            None, all the samples are drawn
         figure_options
             see _prepare_figure inputs
 
@@ -108,15 +96,9 @@ class CoPData(Data):
         The matplotlib figure handler if show_now was set to False
         """
 
-        fig, ax, color, show_now = self._prepare_figure(**figure_options)
-
-        ax.plot(self.y[:, 0], self.y[:, 1], color=color)
-        ax.axis("equal")
-
-        if show_now:
-            plt.show()
-
-        return fig if not show_now else None
+        return self._plot(
+            self.y[:, 0], self.y[:, 1], envelope=self.y, max_points=max_points, axis_equal=True, **figure_options
+        )
 
     def plot_displacement(self, **figure_options) -> plt.figure:
         """
@@ -176,16 +158,22 @@ class CoPData(Data):
 
         Returns
         -------
-
+        The distance travelled by the CoP over 2 * window samples, centered on each sample
         """
 
         two_windows = window * 2
-        padding = np.nan * np.zeros((window, 1))
-
-        return np.concatenate(
-            (
-                padding,
-                np.linalg.norm(self.y[two_windows:, :] - self.y[:-two_windows, :], axis=1)[:, np.newaxis],
-                padding,
-            )
-        )
+
+        # Only the padding is filled with nan, the rest is written once: the X difference goes straight into the
+        # output, which is then replaced in place by the norm with the Y difference. The norm is written as
+        # sqrt(dx * dx + dy * dy) since np.hypot, which guards against overflows irrelevant here, is much slower
+        displacement = np.empty((self.y.shape[0], 1), dtype=self.y.dtype)
+        displacement[:window, 0] = np.nan
+        displacement[-window:, 0] = np.nan
+        inner = displacement[window:-window, 0]
+        np.subtract(self.y[two_windows:, 0], self.y[:-two_windows, 0], out=inner)
+        dy = self.y[two_windows:, 1] - self.y[:-two_windows, 1]
+        np.multiply(inner, inner, out=inner)
+        np.multiply(dy, dy, out=dy)
+        inner += dy
+        np.sqrt(inner, out=inner)
+        return displacement
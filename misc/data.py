@@ -1,11 +1,24 @@
+from functools import cached_property
+from weakref import WeakValueDictionary
+
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
 
+# The value written by the hardware (MAX_INT of its int32 registers) when a sensor has no data
+_NO_DATA = np.iinfo(np.int32).max
+
+# The figures already created by _prepare_figure, by name, so the pyplot registry is not searched on every plot
+_FIGURE_CACHE: WeakValueDictionary = WeakValueDictionary()
+# The last axis drawn on in each of these figures, so the axes of the figure are not listed on every plot
+_AXIS_CACHE: WeakValueDictionary = WeakValueDictionary()
+
 
 class Data:
     def __init__(self, data=None, nb_sensors: int = 0, conversion_factor: float = 1):
         """
-        Create a Data structure with 't' as time vector holder and 'y' as data holder
+        Create a Data structure with 't' as time vector holder and 'y' as data holder. Unless copied from another
+        data set, 't' is stored in float64 (so the time steps stay accurate on long recordings) and 'y' in float32
         Parameters
         ----------
         data
@@ -16,17 +29,48 @@ class Data:
             The factor to convert the data when using the 'append' method
         """
 
+        # The appended samples are kept aside and only concatenated to t and y when these are accessed
+        self._appended_t: list[np.ndarray] = []
+        self._appended_y: list[np.ndarray] = []
+
         if data is not None:
             self.t = data.t
             self.y = data.y
             self.conversion_factor = data.conversion_factor
+            # The same y is shared, so what is already known about it (e.g. offset by 'concatenate') still holds
+            self._in_air = data._in_air
+            self._takeoffs_indices = data._takeoffs_indices
+            self._landings_indices = data._landings_indices
         else:
-            self.t: np.ndarray = np.ndarray((0,))
-            self.y: np.ndarray = np.ndarray((0, nb_sensors))
+            self.t: np.ndarray = np.ndarray((0,), dtype=np.float64)
+            self.y: np.ndarray = np.ndarray((0, nb_sensors), dtype=np.float32)
             self.conversion_factor = conversion_factor
-        self.takeoffs_indices, self.landings_indices = self.compute_timings_indices(
-            np.sum(self.y, axis=1)[:, np.newaxis]
-        )
+
+    @classmethod
+    def from_array(cls, t, y, conversion_factor: float = 1, dtype: type = np.float32):
+        """
+        Create a Data structure from all the samples at once (see 'append_many' to add them to an existing one)
+
+        Parameters
+        ----------
+        t
+            The time vector (samples), copied so the data set owns a writable one
+        y
+            The raw data (samples x sensors), converted with conversion_factor
+        conversion_factor
+            The factor to convert the data
+        dtype
+            The type to store the data in. The time is always kept in float64
+
+        Returns
+        -------
+        The data structure (of the class it is called on)
+        """
+
+        out = Data(nb_sensors=np.shape(y)[1], conversion_factor=conversion_factor)
+        out.t = np.array(t, dtype=np.float64)
+        out.y = out.convert(y).astype(dtype, copy=False)
+        return out if cls is Data else cls(out)
 
     def append(self, t, y) -> None:
         """
@@ -37,14 +81,167 @@ class Data:
         t
             The time to add
         y
-            The data to add (converted with self.conversion_factor)
+            The data to add (converted with self.conversion_factor and stored in the type of self.y)
         """
 
-        self.t = np.concatenate((self.t, (t,)))
+        self.append_many((t,), np.asarray(y)[np.newaxis, :])
 
-        # Remove the MAX_INT and convert to m
-        y = [data * self.conversion_factor if data != 2147483647 else np.nan for data in y]
-        self.y = np.concatenate((self.y, (y,)))
+    def append_many(self, t, y) -> None:
+        """
+        Add a batch of samples to the data set at once, which is much faster than calling 'append' for each of them
+
+        Parameters
+        ----------
+        t
+            The times to add (samples)
+        y
+            The data to add (samples x sensors), converted with self.conversion_factor and stored in the type of self.y
+        """
+
+        self._appended_t.append(np.asarray(t, dtype=np.float64))
+        self._appended_y.append(self.convert(y).astype(self._y.dtype, copy=False))
+        self._takeoffs_indices = None
+        self._landings_indices = None
+        self._clear_cached_properties()
+
+    @property
+    def t(self) -> np.ndarray:
+        """
+        Get the time vector
+        """
+        self._concatenate_appended()
+        return self._t
+
+    @t.setter
+    def t(self, t: np.ndarray) -> None:
+        self._concatenate_appended()
+        self._t = t
+        self._clear_cached_properties()
+
+    @property
+    def y(self) -> np.ndarray:
+        """
+        Get the data (samples x sensors)
+        """
+        self._concatenate_appended()
+        return self._y
+
+    @y.setter
+    def y(self, y: np.ndarray) -> None:
+        self._concatenate_appended()
+        self._y = y
+        self._in_air = None
+        self._takeoffs_indices = None
+        self._landings_indices = None
+        self._clear_cached_properties()
+
+    @property
+    def in_air(self) -> np.ndarray:
+        """
+        Get if each sample is in the air (any of its sensors being nan). The mask is kept until y is replaced
+        """
+        self._concatenate_appended()
+        if self._in_air is None:
+            self._in_air = np.isnan(self._y).any(axis=1)
+        return self._in_air
+
+    @property
+    def takeoffs_indices(self) -> np.ndarray:
+        """
+        Get the index of the takeoff of each jump. The timings are detected from 'in_air' when first needed and kept
+        until y is replaced or samples are appended
+        """
+        self._detect_timings_indices()
+        return self._takeoffs_indices
+
+    @takeoffs_indices.setter
+    def takeoffs_indices(self, indices: np.ndarray) -> None:
+        self._takeoffs_indices = indices
+        self._clear_cached_properties()
+
+    @property
+    def landings_indices(self) -> np.ndarray:
+        """
+        Get the index of the landing of each jump (see 'takeoffs_indices')
+        """
+        self._detect_timings_indices()
+        return self._landings_indices
+
+    @landings_indices.setter
+    def landings_indices(self, indices: np.ndarray) -> None:
+        self._landings_indices = indices
+        self._clear_cached_properties()
+
+    def _detect_timings_indices(self) -> None:
+        """
+        Detect the timings from 'in_air' if they are not known
+        """
+
+        self._concatenate_appended()
+        if self._takeoffs_indices is None or self._landings_indices is None:
+            self._takeoffs_indices, self._landings_indices = self.compute_timings_indices(self.in_air)
+
+    @classmethod
+    def _cached_property_names(cls) -> frozenset:
+        """
+        Get the names of all the cached properties of the class (including the inherited ones). They are collected
+        once per class, when first needed
+        """
+
+        names = cls.__dict__.get("_cached_properties")
+        if names is None:
+            names = frozenset(
+                name
+                for base in cls.__mro__
+                for name, attribute in vars(base).items()
+                if isinstance(attribute, cached_property)
+            )
+            cls._cached_properties = names
+        return names
+
+    def _clear_cached_properties(self) -> None:
+        """
+        Forget the values of all the cached properties (of this class and its subclasses) so they are computed again
+        from the current data
+        """
+
+        for name in self.__dict__.keys() & self._cached_property_names():
+            del self.__dict__[name]
+
+    def _concatenate_appended(self) -> None:
+        """
+        Move the samples added with 'append' to t and y, using a single concatenation for all of them
+        """
+
+        if not self._appended_t:
+            return
+
+        self._t = np.concatenate((self._t, *self._appended_t))
+        self._y = np.concatenate((self._y, *self._appended_y))
+        if self._in_air is not None:
+            self._in_air = np.concatenate((self._in_air, *(np.isnan(y).any(axis=1) for y in self._appended_y)))
+        self._appended_t = []
+        self._appended_y = []
+
+    def convert(self, y) -> np.ndarray:
+        """
+        Convert raw data with self.conversion_factor, the MAX_INT (no data) being replaced by nan
+
+        Parameters
+        ----------
+        y
+            The raw data. They can be passed as read from the hardware (an int32 array), in which case the no data
+            values are detected on the integers before any conversion
+
+        Returns
+        -------
+        The converted data
+        """
+
+        y = np.asarray(y)
+        converted = np.multiply(y, self.conversion_factor, dtype=np.float64)
+        converted[y == _NO_DATA] = np.nan
+        return converted
 
     def concatenate(self, other):
         """
@@ -60,51 +257,98 @@ class Data:
         The concatenated data
         """
 
-        out = Data(data=self)
-        time_offset = out.t[-1]
+        return Data._concatenate_all((self, other))
 
-        out.t = np.concatenate((out.t, time_offset + other.t))
-        out.y = np.concatenate((out.y, other.y))
-        out.takeoffs_indices, out.landings_indices = out.compute_timings_indices(np.sum(out.y, axis=1)[:, np.newaxis])
+    @staticmethod
+    def _concatenate_all(all_data):
+        """
+        Concatenate data sets, assuming the time of each one is added as an offset to the next one. This is the rule
+        shared by 'concatenate' and helpers.concatenate_data
 
-        # Remove the extra index created from the discrepancy of the concatenated data
-        out.takeoffs_indices = np.concatenate(
-            (
-                out.takeoffs_indices[0 : len(self.takeoffs_indices)],
-                out.takeoffs_indices[len(self.takeoffs_indices) + 1 :],
-            )
-        )
-        out.landings_indices = np.concatenate(
-            (
-                out.landings_indices[0 : len(self.landings_indices)],
-                out.landings_indices[len(self.landings_indices) + 1 :],
-            )
-        )
+        Parameters
+        ----------
+        all_data
+            The data sets to concatenate
 
+        Returns
+        -------
+        The concatenated data (a plain Data, the subclasses keep its timings when built from it)
+        """
+
+        # Fill the concatenated arrays in place (no intermediate array is created)
+        nb_samples = sum(data.t.shape[0] for data in all_data)
+        t = np.empty((nb_samples,), dtype=all_data[0].t.dtype)
+        y = np.empty((nb_samples, all_data[0].y.shape[1]), dtype=np.result_type(*(data.y for data in all_data)))
+        in_air = np.empty((nb_samples,), dtype=bool)
+
+        # The timings of each data set are already known, so they are offset rather than detected again. This also
+        # prevents the detection from creating an extra jump across the junction of two data sets
+        takeoffs_indices = []
+        landings_indices = []
+
+        first = 0
+        time_offset = 0
+        for data in all_data:
+            last = first + data.t.shape[0]
+            np.add(data.t, time_offset, out=t[first:last])
+            y[first:last, :] = data.y
+            in_air[first:last] = data.in_air
+            takeoffs_indices.append(data.takeoffs_indices + first)
+            landings_indices.append(data.landings_indices + first)
+            time_offset = t[last - 1]
+            first = last
+
+        out = Data(conversion_factor=all_data[0].conversion_factor)
+        out.t = t
+        out.y = y
+        out._in_air = in_air
+        out.takeoffs_indices = np.concatenate(takeoffs_indices)
+        out.landings_indices = np.concatenate(landings_indices)
         return out
 
-    @property
-    def flight_times(self) -> tuple[float, ...]:
+    @cached_property
+    def flight_times(self) -> np.ndarray:
         """
-        Get the times in the mat
+        Get the times in the air
         """
-        return tuple(
-            self.t[landing] - self.t[takeoff] for takeoff, landing in zip(self.takeoffs_indices, self.landings_indices)
-        )
+        return self.t[self.landings_indices] - self.t[self.takeoffs_indices]
 
-    @property
-    def mat_times(self) -> tuple[float, ...]:
+    @cached_property
+    def mat_times(self) -> np.ndarray:
         """
         Get the times in the mat
         """
-        return tuple(
-            self.t[takeoff] - self.t[landing]
-            for takeoff, landing in zip(self.takeoffs_indices[1:], self.landings_indices[:-1])
-        )
+        return self.t[self._mat_ends] - self.t[self._mat_starts]
+
+    @cached_property
+    def _half_time_steps(self) -> np.ndarray:
+        """
+        Get the half of each time step ((t[1:] - t[:-1]) / 2), shared by all the integrals of the data set. The steps are
+        subtracted in the type of t for their precision, but stored in the type of y
+        """
+        half_dt = np.subtract(self.t[1:], self.t[:-1]).astype(np.result_type(self.y, np.float32), copy=False)
+        half_dt *= 0.5
+        return half_dt
+
+    @cached_property
+    def _mat_starts(self) -> np.ndarray:
+        """
+        Get the index of the first sample of each period in the mat (a landing), the mat periods going from a landing
+        to the next takeoff
+        """
+        return np.asarray(self.landings_indices[:-1], dtype=np.int64)
+
+    @cached_property
+    def _mat_ends(self) -> np.ndarray:
+        """
+        Get the index of the end (excluded) of each period in the mat (the next takeoff)
+        """
+        return np.asarray(self.takeoffs_indices[1:], dtype=np.int64)
 
     def plot(
         self,
         override_y: np.ndarray = None,
+        max_points: int = 10000,
         **figure_options,
     ) -> plt.figure:
         """
@@ -114,6 +358,45 @@ class Data:
         ----------
         override_y
             Force to plot this y data instead of the one in the self.y attribute
+        max_points
+            The number of points above which the data are downsampled for the drawing (see _downsample_indices). If
+            None, all the samples are drawn
+        figure_options
+            see _prepare_figure inputs
+
+        Returns
+        -------
+        The matplotlib figure handler if show_now was set to False
+        """
+
+        y = override_y if override_y is not None else self.y
+        return self._plot(self.t, y, envelope=y, max_points=max_points, **figure_options)
+
+    def _plot(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        envelope: np.ndarray,
+        max_points: int = 10000,
+        axis_equal: bool = False,
+        **figure_options,
+    ) -> plt.figure:
+        """
+        Draw y against x, which all the plot methods share
+
+        Parameters
+        ----------
+        x
+            The abscissa of the samples
+        y
+            The ordinates of the samples (samples, or samples x columns)
+        envelope
+            The data whose envelope is kept when downsampling the samples to draw (see _downsample_indices)
+        max_points
+            The number of points above which the data are downsampled for the drawing. If None, all the samples are
+            drawn
+        axis_equal
+            If the axis should have the same scale on X and Y
         figure_options
             see _prepare_figure inputs
 
@@ -124,7 +407,46 @@ class Data:
 
         fig, ax, color, show_now = self._prepare_figure(**figure_options)
 
-        ax.plot(self.t, override_y if override_y is not None else self.y, color=color)
+        idx = self._downsample_indices(envelope, max_points) if max_points is not None else slice(None)
+        ax.plot(x[idx], y[idx], color=color, rasterized=True)
+        if axis_equal:
+            ax.axis("equal")
+
+        if show_now:
+            plt.show()
+
+        return fig if not show_now else None
+
+    @staticmethod
+    def plot_many(all_data: list, max_points: int = 10000, **figure_options) -> plt.figure:
+        """
+        Plot several data sets as time dependent variables on the same axis (e.g. to overlay trials). All their
+        columns are drawn as a single LineCollection instead of one line per data set
+
+        Parameters
+        ----------
+        all_data
+            The data sets to plot
+        max_points
+            The number of points above which each data set is downsampled for the drawing (see _downsample_indices). If
+            None, all the samples are drawn
+        figure_options
+            see _prepare_figure inputs
+
+        Returns
+        -------
+        The matplotlib figure handler if show_now was set to False
+        """
+
+        fig, ax, color, show_now = Data._prepare_figure(**figure_options)
+
+        lines = []
+        for data in all_data:
+            idx = Data._downsample_indices(data.y, max_points) if max_points is not None else slice(None)
+            t = data.t[idx]
+            lines.extend(np.column_stack((t, column)) for column in data.y[idx].T)
+        ax.add_collection(LineCollection(lines, colors=color, rasterized=True))
+        ax.autoscale_view()
 
         if show_now:
             plt.show()
@@ -146,11 +468,23 @@ class Data:
         -------
         The matplotlib figure handler if show_now was set to False
         """
-        y = np.nan * np.ndarray(self.y.shape[0])
+        return Data.plot(self, override_y=self._flight_times_per_sample * factor, **figure_options)
+
+    @cached_property
+    def _flight_times_per_sample(self) -> np.ndarray:
+        """
+        Get the flight time of the flight each sample belongs to (nan for the samples in the mat)
+        """
+
+        y = np.full((self.y.shape[0],), np.nan)
 
-        for takeoff, landing, flight in zip(self.takeoffs_indices, self.landings_indices, self.flight_times):
-            y[takeoff:landing] = flight
-        return Data.plot(self, override_y=y * factor, **figure_options)
+        # Gather the indices of all the flight periods at once: a range over all the flight samples, shifted for each
+        # flight by the gap between its takeoff and its first position in that range
+        lengths = self.landings_indices - self.takeoffs_indices
+        first_positions = np.cumsum(lengths) - lengths
+        indices = np.arange(np.sum(lengths)) + np.repeat(self.takeoffs_indices - first_positions, lengths)
+        y[indices] = np.repeat(self.flight_times, lengths)
+        return y
 
     @staticmethod
     def show() -> None:
@@ -199,14 +533,22 @@ class Data:
         The figure and the axis handler
         """
 
-        fig = plt.figure(figure)
+        fig = _FIGURE_CACHE.get(figure) if figure is not None else None
+        if fig is None or not plt.fignum_exists(fig.number):
+            fig = plt.figure(figure)
+            if figure is not None:
+                _FIGURE_CACHE[figure] = fig
 
-        if not fig.axes:
-            ax = plt.axes()
-        else:
-            ax = fig.axes[-1]
-            if axis_on_right:
-                ax = ax.twinx()
+        ax = _AXIS_CACHE.get(figure) if figure is not None else None
+        if ax is None or ax.figure is not fig:
+            ax = fig.axes[-1] if fig.axes else None
+
+        if ax is None:
+            ax = fig.add_subplot()
+        elif axis_on_right:
+            ax = ax.twinx()
+        if figure is not None:
+            _AXIS_CACHE[figure] = ax
 
         if title is not None:
             ax.set_title(title)
@@ -222,37 +564,87 @@ class Data:
             ax.yaxis.tick_right()
 
         if maximize:
-            manager = plt.get_current_fig_manager()
-            manager.window.showMaximized()
+            fig.canvas.manager.window.showMaximized()
 
         return fig, ax, color, show_now
 
     @staticmethod
-    def compute_timings_indices(data) -> tuple[np.ndarray, np.ndarray]:
+    def _downsample_indices(data: np.ndarray, nb_points: int = 10000) -> np.ndarray:
         """
-        Get the flight time for each flights in the data.
-        The flight moments are defined as "nan" in the displacement data.
+        Select the samples to draw so a long signal is not plotted point by point. The signal is split in buckets and
+        only the minimum and the maximum of each column are kept in each bucket, which preserves the envelope of the
+        signal. The first nan of each bucket is kept as well, so the gaps in the signal (e.g. the flights) are never
+        bridged, however short they are. Only the rendering should use this, never the analyses
 
         Parameters
         ----------
         data
-            Data vector to compute the timings time from
+            The data to plot (samples x columns, or samples)
+        nb_points
+            The number of samples under which the data are drawn as is. Above it, they are reduced to about this number
+            of points per column
+
+        Returns
+        -------
+        The sorted indices of the samples to draw
+        """
+
+        nb_samples = data.shape[0]
+        if nb_samples <= nb_points:
+            return np.arange(nb_samples)
+
+        data = data.reshape((nb_samples, -1))  # A single signal can be sent as a vector
+
+        bucket_size = int(np.ceil(nb_samples / (nb_points // 2)))
+        nb_buckets = int(np.ceil(nb_samples / bucket_size))
+
+        # Pad the data to full buckets with nan, which are then ignored as +inf (for min) and -inf (for max)
+        padded = np.full((nb_buckets * bucket_size, data.shape[1]), np.nan, dtype=data.dtype)
+        padded[:nb_samples, :] = data
+        buckets = padded.reshape((nb_buckets, bucket_size, data.shape[1]))
+        is_nan = np.isnan(buckets)
+        minima = np.argmin(np.where(is_nan, np.inf, buckets), axis=1)
+        maxima = np.argmax(np.where(is_nan, -np.inf, buckets), axis=1)
+        first_nans = np.argmax(is_nan, axis=1)
+
+        first_indices = (np.arange(nb_buckets) * bucket_size)[:, np.newaxis]
+        idx = np.unique(
+            np.concatenate(
+                (
+                    (first_indices + minima).ravel(),
+                    (first_indices + maxima).ravel(),
+                    (first_indices + first_nans)[is_nan.any(axis=1)],
+                )
+            )
+        )
+        return idx[idx < nb_samples]
+
+    @staticmethod
+    def compute_timings_indices(in_air: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the flight time for each flights in the data.
+        The flight moments are defined as "nan" in the data (see the 'in_air' property).
+
+        Parameters
+        ----------
+        in_air
+            If each sample is in the air, to compute the timings time from
 
         Returns
         -------
         The timing indices of the jumps (takeoff and landing)
         """
 
-        if not data.any():
-            return np.ndarray((0,)), np.ndarray((0,))
+        if not in_air.any():
+            return np.ndarray((0,), dtype=np.int64), np.ndarray((0,), dtype=np.int64)
 
         # Find all landing and takeoff indices
-        currently_in_air = 1 * np.isnan(data)  # 1 for True, 0 for False
-        padding = ((0,),)
-        events = np.concatenate((padding, currently_in_air[1:] - currently_in_air[:-1]))
+        currently_in_air = in_air.view(np.int8)  # 1 for True, 0 for False
+        events = np.empty(currently_in_air.shape, dtype=np.int8)
+        np.subtract(currently_in_air[1:], currently_in_air[:-1], out=events[1:])
         events[:2] = 0  # Remove any possible artifact from cop_displacement starting
-        landings_indices = np.where(events == -1)[0]
-        takeoffs_indices = np.where(events == 1)[0]
+        landings_indices = np.flatnonzero(events == -1)
+        takeoffs_indices = np.flatnonzero(events == 1)
 
         # Remove starting and ending artifacts and perform sanity check
         if landings_indices[0] < takeoffs_indices[0]:
@@ -1,17 +1,23 @@
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from itertools import islice
 import os
 import re
+from typing import Callable
 
-import csv
 import numpy as np
 
 from .data import Data
 from .cop_data import CoPData
 from .force_sensor_data import ForceSensorData
 
+# Matches the trial name of each file name of a newline-separated list (e.g. "001" in "001_CYCL.CSV")
+_TRIAL_FILENAME_REGEX = re.compile(r"^([0-9_.]*)_[a-zA-Z_.]*\.CSV$", re.MULTILINE)
+
 
 class DataReader:
     @staticmethod
-    def read_cycl_data(filepath) -> CoPData:
+    def read_cycl_data(filepath, dtype: type = np.float32) -> CoPData:
         """
         Read the CYCL file which is the CoP coordinates of cyclogramme
 
@@ -19,6 +25,8 @@ class DataReader:
         ----------
         filepath
             The path of the file to read
+        dtype
+            The type to store the data in
 
         Returns
         -------
@@ -26,11 +34,13 @@ class DataReader:
         """
 
         return CoPData(
-            DataReader._read_csv(f"{filepath}_CYCL.CSV", nb_sensors=2, nb_headers_rows=1, conversion_factor=1 / 1000)
+            DataReader._read_csv(
+                f"{filepath}_CYCL.CSV", nb_sensors=2, nb_headers_rows=1, conversion_factor=1 / 1000, dtype=dtype
+            )
         )
 
     @staticmethod
-    def read_sensor_data(filepath) -> ForceSensorData:
+    def read_sensor_data(filepath, dtype: type = np.float32) -> ForceSensorData:
         """
         Read the GL file which is the CoP coordinate of gait line
 
@@ -38,13 +48,15 @@ class DataReader:
         ----------
         filepath
             The path of the file to read
+        dtype
+            The type to store the data in
 
         Returns
         -------
         The parsed data in the file
         """
-        right = DataReader._read_csv(f"{filepath}_R.CSV", nb_headers_rows=4)
-        left = DataReader._read_csv(f"{filepath}_L.CSV", nb_headers_rows=4)
+        right = DataReader._read_csv(f"{filepath}_R.CSV", nb_headers_rows=4, dtype=dtype, sum_sensors=True)
+        left = DataReader._read_csv(f"{filepath}_L.CSV", nb_headers_rows=4, dtype=dtype, sum_sensors=True)
         if sum(right.t - left.t) != 0.0:
             raise RuntimeError("Left and Right sensor data don't match")
 
@@ -53,9 +65,43 @@ class DataReader:
         both.y = (np.sum(right.y, axis=1) + np.sum(left.y, axis=1))[:, np.newaxis]
         return ForceSensorData(both)
 
+    @staticmethod
+    def read_many(read_function: Callable, filepaths, max_workers: int = None) -> list:
+        """
+        Read several trials in parallel (the parsing being CPU bound, each trial is read in its own process)
+
+        Parameters
+        ----------
+        read_function
+            The function to read each trial with (e.g. DataReader.read_cycl_data)
+        filepaths
+            The paths of the trials to read
+        max_workers
+            The maximum number of processes to use, if 'None' it uses one per processor. If 1, the trials are read
+            sequentially in the current process
+
+        Returns
+        -------
+        The data of each trial, in the order of filepaths
+        """
+
+        filepaths = list(filepaths)
+        if len(filepaths) <= 1 or max_workers == 1:
+            return [read_function(filepath) for filepath in filepaths]
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(read_function, filepaths))
+
     @staticmethod
     def _read_csv(
-        filepath, nb_sensors: int = None, nb_rows: int = None, nb_headers_rows: int = 0, conversion_factor: float = 1
+        filepath,
+        nb_sensors: int = None,
+        nb_rows: int = None,
+        nb_headers_rows: int = 0,
+        conversion_factor: float = 1,
+        dtype: type = np.float32,
+        sum_sensors: bool = False,
+        nb_rows_per_block: int = 65536,
     ) -> Data:
         """
         Read the actual file, assuming 'ncols' in the data
@@ -73,29 +119,131 @@ class DataReader:
             The number of header rows (they are skipped)
         conversion_factor
             The factor to convert the data
+        dtype
+            The type to store the data in. The time is always kept in float64 so the time steps stay accurate on
+            long recordings
+        sum_sensors
+            If the sensors should be summed into a single column. The table is then converted and summed by blocks of
+            rows, so a huge sensor file memory-mapped from the cache never has to be held in memory at its full width
+            (a file read for the first time is parsed in memory before being cached)
+        nb_rows_per_block
+            The number of rows to convert at once when 'sum_sensors' is True
 
         Returns
         -------
         The parsed data in the file
         """
 
-        out = Data(nb_sensors=nb_sensors, conversion_factor=conversion_factor) if nb_sensors is not None else None
+        usecols = range(nb_sensors + 1) if nb_sensors is not None else None
+        if nb_rows is None:
+            data = DataReader._cached_parse_csv(filepath, nb_headers_rows=nb_headers_rows, usecols=usecols)
+        else:
+            data = DataReader._parse_csv(filepath, nb_headers_rows=nb_headers_rows, nb_rows=nb_rows, usecols=usecols)
+
+        if not sum_sensors:
+            return Data.from_array(data[:, 0], data[:, 1:], conversion_factor=conversion_factor, dtype=dtype)
+
+        out = Data(nb_sensors=1, conversion_factor=conversion_factor)
+        out.t = np.array(data[:, 0])  # A copy, so t is never a view on the (read-only) cached table
+        out.y = np.ndarray((data.shape[0], 1), dtype=dtype)
+        for first in range(0, data.shape[0], nb_rows_per_block):
+            rows = slice(first, first + nb_rows_per_block)
+            out.y[rows, 0] = np.sum(out.convert(data[rows, 1:]), axis=1)
+        return out
+
+    @staticmethod
+    def _parse_csv(filepath, nb_headers_rows: int = 0, nb_rows: int = None, usecols: range = None) -> np.ndarray:
+        """
+        Parse the table of a CSV file using np.loadtxt. If the file is malformed for np.loadtxt (e.g. rows of different
+        lengths), it is parsed row by row instead, each row being cut to the width of the first one
+
+        Parameters
+        ----------
+        filepath
+            The path for the file to read
+        nb_headers_rows
+            The number of header rows (they are skipped)
+        nb_rows
+            The maximum number of rows to read, if 'None' it reads all
+        usecols
+            The columns to read, if 'None' it reads all
+
+        Returns
+        -------
+        The parsed table (rows x columns)
+        """
+
+        try:
+            return np.loadtxt(
+                filepath,
+                delimiter=",",
+                comments=None,
+                skiprows=nb_headers_rows,
+                max_rows=nb_rows,
+                usecols=usecols,
+                ndmin=2,
+            )
+        except ValueError:
+            pass
 
         with open(filepath) as csvfile:
-            rows = csv.reader(csvfile, delimiter=",")
-            for i, row in enumerate(rows):
-                if i < nb_headers_rows:
-                    continue
-                if nb_rows is not None and i >= nb_rows + nb_headers_rows:
-                    break
+            last_row = None if nb_rows is None else nb_headers_rows + nb_rows
+            rows = list(islice(csv.reader(csvfile, delimiter=","), nb_headers_rows, last_row))
+        nb_columns = len(usecols) if usecols is not None else len(rows[0]) if rows else 0
 
-                if out is None:
-                    nb_sensors = len(row[1:])
-                    out = Data(nb_sensors=nb_sensors, conversion_factor=conversion_factor)
+        # The table is preallocated and filled row by row, numpy converting the cells itself (no call to float per cell)
+        data = np.empty((len(rows), nb_columns), dtype=np.float64)
+        for i, row in enumerate(rows):
+            data[i, :] = row[:nb_columns]
+        return data
 
-                out.append(float(row[0]), [float(i) for i in row[1 : nb_sensors + 1]])
+    @staticmethod
+    def _cached_parse_csv(filepath, nb_headers_rows: int = 0, usecols: range = None) -> np.ndarray:
+        """
+        Parse a whole CSV file (see _parse_csv). A binary copy (.npy) of the parsed table is kept in a '.cache' folder
+        next to the file so the subsequent reads of an unchanged file are memory-mapped instead of parsed again. The
+        table is stored column-major, so the time and each sensor are contiguous in the memory map. The copy is written
+        to a temporary file first and then moved in place, so a concurrent read never maps a partial copy. If the copy
+        cannot be written (e.g. read-only data folder), the table is simply not cached
 
-        return out
+        Parameters
+        ----------
+        filepath
+            The path for the file to read
+        nb_headers_rows
+            The number of header rows (they are skipped)
+        usecols
+            The columns to read, if 'None' it reads all
+
+        Returns
+        -------
+        The parsed table. When it comes from the cache, it is a read-only memory map
+        """
+
+        # The parse options are part of the name, so reading the same file with other options does not get this table
+        columns = "all" if usecols is None else "-".join(str(column) for column in usecols)
+        cache_folder = os.path.join(os.path.dirname(filepath), ".cache")
+        cache_path = os.path.join(cache_folder, f"{os.path.basename(filepath)}.{nb_headers_rows}.{columns}.npy")
+        if os.path.isfile(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(filepath):
+            return np.load(cache_path, mmap_mode="r")
+
+        data = DataReader._parse_csv(filepath, nb_headers_rows=nb_headers_rows, usecols=usecols)
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(cache_folder, exist_ok=True)
+            # The column-major copy is written through a memory map of the file, so a second copy of the whole table
+            # is never held in memory (the parsed table itself is returned as is)
+            copy = np.lib.format.open_memmap(
+                temporary_path, mode="w+", dtype=data.dtype, shape=data.shape, fortran_order=True
+            )
+            copy[...] = data
+            copy.flush()
+            del copy
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            if os.path.isfile(temporary_path):
+                os.remove(temporary_path)
+        return data
 
     @staticmethod
     def fetch_trial_names(folder) -> tuple[str, ...]:
@@ -112,7 +260,8 @@ class DataReader:
         A tuple of all the names
         """
 
-        all_filenames = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))]
-        root_names = [re.split(r"^([0-9_.]*)_([a-zA-Z_.]*)(.CSV)$", filename)[1] for filename in all_filenames]
-        unique_names = set(root_names)
+        # All the file names are matched in a single scan of their newline-separated list
+        with os.scandir(folder) as entries:
+            filenames = "\n".join(entry.name for entry in entries if entry.is_file() and "\n" not in entry.name)
+        unique_names = set(_TRIAL_FILENAME_REGEX.findall(filenames))
         return tuple(sorted(unique_names))
@@ -1,13 +1,25 @@
+from functools import cached_property
+
 import numpy as np
 
 from .data import Data
-from .helpers import integral
+from .helpers import segments_integral
 
 
 class ForceSensorData(Data):
     def __init__(self, data: Data):
-        data.y = np.sum(data.y, axis=1)[:, np.newaxis]
-        data.y[data.y < 20] = np.nan
+        forces = np.sum(data.y, axis=1)
+        np.putmask(forces, forces < 20, np.nan)
+
+        # Replacing y drops the timings. When the forces give the same mask (e.g. data already summed and masked, such
+        # as a concatenation), the timings known for data still hold, so they are kept
+        in_air = np.isnan(forces)
+        known_timings = data._takeoffs_indices, data._landings_indices
+        keep_timings = all(indices is not None for indices in known_timings) and np.array_equal(in_air, data.in_air)
+        data.y = forces[:, np.newaxis]
+        data._in_air = in_air
+        if keep_timings:
+            data._takeoffs_indices, data._landings_indices = known_timings
         super().__init__(data=data)
 
     def concatenate(self, other):
@@ -26,12 +38,9 @@ class ForceSensorData(Data):
 
         return ForceSensorData(super().concatenate(other))
 
-    @property
-    def force_integral(self) -> tuple[float, ...]:
+    @cached_property
+    def force_integral(self) -> np.ndarray:
         """
         Get the force integral (impulse) in the mat
         """
-        return tuple(
-            integral(self.t[l:t], self.y[l:t, :])
-            for t, l in zip(self.takeoffs_indices[1:], self.landings_indices[0:-1])
-        )
+        return segments_integral(self.t, self.y, self._mat_starts, self._mat_ends, self._half_time_steps)
@@ -1,11 +1,25 @@
 import numpy as np
 
+from .data import Data
+
 
 def concatenate_data(all_data: list):
-    concatenated_data = all_data[0]
-    for data in all_data[1:]:
-        concatenated_data = concatenated_data.concatenate(data)
-    return concatenated_data
+    """
+    Concatenate a list of data sets, assuming the time of each one is added as an offset to the next one. The final
+    arrays are allocated once and filled in place instead of being grown one data set at a time
+
+    Parameters
+    ----------
+    all_data
+        The data sets to concatenate (all of the same type)
+
+    Returns
+    -------
+    The concatenated data, of the same type as the data sets. Like Data.concatenate, the timings of each data set are
+    offset rather than detected again, so no jump is created across the junctions
+    """
+
+    return type(all_data[0])(Data._concatenate_all(all_data))
 
 
 def derivative(t: np.ndarray, data: np.ndarray, window: int = 1) -> np.ndarray:
@@ -23,19 +37,21 @@ def derivative(t: np.ndarray, data: np.ndarray, window: int = 1) -> np.ndarray:
 
     Returns
     -------
-    A Data structure with the value differentiated
+    The differentiated data, of the same shape as data (the first and last 'window' samples being nan)
     """
 
     two_windows = window * 2
-    padding = np.nan * np.zeros((window, data.shape[1]))
 
-    return np.concatenate(
-        (
-            padding,
-            (data[:-two_windows, :] - data[two_windows:]) / (t[:-two_windows] - t[two_windows:])[:, np.newaxis],
-            padding,
-        )
-    )
+    # Fill the derivative directly in the output so no padding nor intermediate array has to be concatenated
+    out = np.empty(data.shape, dtype=data.dtype)
+    out[:window, :] = np.nan
+    out[-window:, :] = np.nan
+    np.subtract(data[:-two_windows, :], data[two_windows:, :], out=out[window:-window, :])
+    # The time steps are subtracted in the type of t (precision), but divided in the type of data so the division does
+    # not have to cast each of its operands on the fly
+    dt = (t[:-two_windows] - t[two_windows:]).astype(out.dtype, copy=False)
+    out[window:-window, :] /= dt[:, np.newaxis]
+    return out
 
 
 def integral(t: np.ndarray, data: np.ndarray) -> float:
@@ -53,4 +69,153 @@ def integral(t: np.ndarray, data: np.ndarray) -> float:
     -------
     The integral of the data
     """
-    return np.nansum((t[1:] - t[:-1]) * ((data[1:, :] + data[:-1, :]) / 2).T)
+    return np.sum(trapezoids(t, data))
+
+
+def trapezoids(t: np.ndarray, data: np.ndarray, half_dt: np.ndarray = None) -> np.ndarray:
+    """
+    Compute the area of each trapezoid of the data (between each pair of consecutive samples). The nan are ignored
+    (their trapezoids are zeros)
+
+    Parameters
+    ----------
+    t
+        The time vector
+    data
+        The data to compute the trapezoids from
+    half_dt
+        The half time steps ((t[1:] - t[:-1]) / 2) if they are already known, so they are not computed again from t
+
+    Returns
+    -------
+    The area of the trapezoids (one row less than data)
+    """
+
+    # The trapezoids are computed in place in the output, in the type of data (the time steps being subtracted in the
+    # type of t for their precision), the half time steps in a single scratch buffer
+    out = np.empty((data.shape[0] - 1, data.shape[1]), dtype=np.result_type(data, np.float32))
+    np.add(data[1:, :], data[:-1, :], out=out)
+    if half_dt is None:
+        half_dt = np.subtract(t[1:], t[:-1]).astype(out.dtype, copy=False)
+        half_dt *= 0.5
+    out *= half_dt.astype(out.dtype, copy=False)[:, np.newaxis]
+    out[np.isnan(out)] = 0
+    return out
+
+
+def segments_integral(
+    t: np.ndarray, data: np.ndarray, starts: np.ndarray, ends: np.ndarray, half_dt: np.ndarray = None
+) -> np.ndarray:
+    """
+    Compute the integral of the data on each segment [starts[i], ends[i]) in a single pass. This gives the same
+    results as calling 'integral' on each of the segments. The segments must be sorted and must not overlap
+
+    Parameters
+    ----------
+    t
+        The time vector
+    data
+        The data to compute the integrals from
+    starts
+        The first index of each segment
+    ends
+        The index following the last index of each segment
+    half_dt
+        The half time steps ((t[1:] - t[:-1]) / 2) if they are already known (see 'trapezoids')
+
+    Returns
+    -------
+    The integral of the data on each segment
+    """
+
+    if not len(starts):
+        return np.ndarray((0,))
+
+    # The trapezoids of a segment go from its first sample to the one before its last sample. The segments of less
+    # than 2 samples have no trapezoid (they integrate to 0), so they are left out of the reduction where they would
+    # otherwise point past the trapezoids
+    areas = trapezoids(t, data, half_dt)
+    integrals = np.zeros((len(starts),), dtype=areas.dtype)
+    has_trapezoids = ends - starts >= 2
+    if np.any(has_trapezoids):
+        reduced = _reduce_segments(np.add, areas, starts[has_trapezoids], ends[has_trapezoids] - 1)
+        integrals[has_trapezoids] = np.sum(reduced, axis=1)
+    return integrals
+
+
+def segments_range(data: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Compute the range (max - min) of the data on each segment [starts[i], ends[i]) in a single pass. The nan are
+    ignored. The segments must be sorted and must not overlap
+
+    Parameters
+    ----------
+    data
+        The data to compute the ranges from
+    starts
+        The first index of each segment
+    ends
+        The index following the last index of each segment
+
+    Returns
+    -------
+    The range of the data on each segment
+    """
+
+    if not len(starts):
+        return np.ndarray((0,))
+
+    maxima = _reduce_segments(np.fmax, data, starts, ends)
+    minima = _reduce_segments(np.fmin, data, starts, ends)
+    return np.fmax.reduce(maxima, axis=1) - np.fmin.reduce(minima, axis=1)
+
+
+def _reduce_segments(ufunc: np.ufunc, data: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Reduce the data on each segment [starts[i], ends[i]) with a single ufunc.reduceat call. The segments must be
+    sorted and must not overlap
+
+    Parameters
+    ----------
+    ufunc
+        The ufunc to reduce with (e.g. np.add, np.fmax)
+    data
+        The data to reduce
+    starts
+        The first index of each segment
+    ends
+        The index following the last index of each segment
+
+    Returns
+    -------
+    The reduced data of each segment (segments x columns)
+    """
+
+    # Each reduction goes from one boundary to the next, so the even ones are the segments
+    boundaries = np.stack((starts, ends), axis=1).ravel()[:-1]
+    return ufunc.reduceat(data[: ends[-1]], boundaries, axis=0)[::2]
+
+
+def pearson_r(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Compute the Pearson correlation coefficient of each row of x with y in a single pass. This gives the same values
+    as scipy.stats.pearsonr, without computing the p-values
+
+    Parameters
+    ----------
+    x
+        The data to correlate (one feature per row)
+    y
+        The reference data to correlate each row of x with
+
+    Returns
+    -------
+    The correlation coefficient of each row of x
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    x_centered = x - np.mean(x, axis=1, keepdims=True)
+    y_centered = y - np.mean(y)
+    return (x_centered @ y_centered) / np.sqrt(np.sum(x_centered**2, axis=1) * np.sum(y_centered**2))
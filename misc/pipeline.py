@@ -0,0 +1,230 @@
+import os
+
+from matplotlib import pyplot as plt
+import numpy as np
+
+from .data import Data
+from .data_reader import DataReader
+from .helpers import concatenate_data, pearson_r
+
+
+def run(
+    data_folder: str = "data",
+    figure_save_folder: str = "results/figures",
+    subjects: tuple[str, ...] = ("sujet1",),
+    show_cop: bool = False,
+    show_cop_displacement: bool = True,
+    show_cop_velocity: bool = True,
+    show_cop_acceleration: bool = True,
+    show_sensors: bool = True,
+    skip_huge_files: bool = False,
+    save_figures: bool = True,
+    show_on_screen: bool = True,
+) -> None:
+    """
+    Load all the trials of each subject, correlate the CoP and sensor features with the jump times and plot them
+
+    Parameters
+    ----------
+    data_folder
+        The folder containing one folder of trials per subject
+    figure_save_folder
+        The folder to save the figures in
+    subjects
+        The name of the subjects to analyse
+    show_cop
+        If the CoP should be plotted
+    show_cop_displacement
+        If the CoP displacement should be plotted
+    show_cop_velocity
+        If the CoP velocity should be plotted
+    show_cop_acceleration
+        If the CoP acceleration should be plotted
+    show_sensors
+        If the sensor forces should be plotted
+    skip_huge_files
+        If the (huge) sensor files should not be loaded
+    save_figures
+        If the figures should be saved to figure_save_folder
+    show_on_screen
+        If the figures should be shown at the end (blocking). If False, the figures are rendered off-screen and closed
+        as soon as they are saved
+    """
+
+    if show_sensors and skip_huge_files:
+        raise ValueError("It is not possible to 'show_sensors' if 'skip_huge_files'")
+
+    if not show_on_screen:
+        plt.switch_backend("Agg")
+
+    if save_figures:
+        if not os.path.exists(figure_save_folder):
+            os.makedirs(figure_save_folder)
+
+    for subject in subjects:
+        folder = f"{data_folder}/{subject}"
+        filenames = DataReader.fetch_trial_names(folder)
+
+        # Load data, parsing the trials in parallel
+        filepaths = [f"{data_folder}/{subject}/{filename}" for filename in filenames]
+        cycl_data = DataReader.read_many(DataReader.read_cycl_data, filepaths)
+        force_data = DataReader.read_many(DataReader.read_sensor_data, filepaths) if not skip_huge_files else None
+
+        # Concatenated the data in a single matrix
+        cycl_data = concatenate_data(cycl_data)
+        force_data = concatenate_data(force_data) if not skip_huge_files else None
+
+        # Print if required
+        filename = "All data"
+        if show_cop:
+            fig_name = f"CoP ({filename})"
+            fig = cycl_data.plot(
+                figure=fig_name,
+                title="CoP",
+                x_label="X-coordinates (m)",
+                y_label="Y-coordinates (m)",
+                color="blue",
+            )
+            if save_figures:
+                fig.set_size_inches(16, 9)
+                fig.savefig(
+                    f"{figure_save_folder}/CoP.png",
+                    dpi=300,
+                    pil_kwargs={"compress_level": 1},
+                    metadata={"Software": None},
+                )
+                if not show_on_screen:
+                    plt.close(fig)
+
+        if show_cop_displacement:
+            displacement_integral_r, displacement_ranges_r = pearson_r(
+                np.array((cycl_data.displacement_integral, cycl_data.displacement_ranges)), cycl_data.flight_times[1:]
+            )
+
+            fig_name = f"CoP displacement ({filename})"
+            fig = cycl_data.plot_displacement(
+                figure=fig_name,
+                title=f"CoP displacement (blue) and Jump time (orange)\n"
+                f"Integral correlation = {displacement_integral_r:0.3f}\n"
+                f"Ranges correlation = {displacement_ranges_r:0.3f}\n",
+                x_label="Time (s)",
+                y_label="CoP displacement (m)",
+                color="blue",
+            )
+            cycl_data.plot_flight_times(
+                figure=fig_name,
+                y_label="Jump time (s)",
+                axis_on_right=True,
+                color="orange",
+            )
+            if save_figures:
+                fig.set_size_inches(16, 9)
+                fig.savefig(
+                    f"{figure_save_folder}/CoP_displacement.png",
+                    dpi=300,
+                    pil_kwargs={"compress_level": 1},
+                    metadata={"Software": None},
+                )
+                if not show_on_screen:
+                    plt.close(fig)
+
+        if show_cop_velocity:
+            velocity_integral_r, velocity_ranges_r = pearson_r(
+                np.array((cycl_data.velocity_integral, cycl_data.velocity_ranges)), cycl_data.flight_times[1:]
+            )
+
+            fig_name = f"CoP Velocity ({filename})"
+            fig = cycl_data.plot_velocity(
+                figure=fig_name,
+                title=f"CoP velocity (blue) and Jump time (orange)\n"
+                f"Integral correlation = {velocity_integral_r:0.3f}\n"
+                f"Ranges correlation = {velocity_ranges_r:0.3f}\n",
+                x_label="Time (s)",
+                y_label="CoP velocity (m/s)",
+                color="blue",
+            )
+            cycl_data.plot_flight_times(
+                figure=fig_name,
+                y_label="Jump time (s)",
+                axis_on_right=True,
+                color="orange",
+            )
+            if save_figures:
+                fig.set_size_inches(16, 9)
+                fig.savefig(
+                    f"{figure_save_folder}/CoP_velocity.png",
+                    dpi=300,
+                    pil_kwargs={"compress_level": 1},
+                    metadata={"Software": None},
+                )
+                if not show_on_screen:
+                    plt.close(fig)
+
+        if show_cop_acceleration:
+            acceleration_integral_r, acceleration_ranges_r = pearson_r(
+                np.array((cycl_data.acceleration_integral, cycl_data.acceleration_ranges)), cycl_data.flight_times[1:]
+            )
+
+            fig_name = f"CoP Acceleration ({filename})"
+            fig = cycl_data.plot_acceleration(
+                figure=fig_name,
+                title=f"CoP acceleration (blue) and Jump time (orange)\n"
+                f"Integral correlation = {acceleration_integral_r:0.3f}\n"
+                f"Ranges correlation = {acceleration_ranges_r:0.3f}\n",
+                x_label="Time (s)",
+                y_label="CoP acceleration (m/s/s)",
+                y_lim=[-60, 200],
+                color="blue",
+            )
+            cycl_data.plot_flight_times(
+                figure=fig_name,
+                y_label="Jump time (s)",
+                y_lim=[1, 2],
+                axis_on_right=True,
+                color="orange",
+            )
+            if save_figures:
+                fig.set_size_inches(16, 9)
+                fig.savefig(
+                    f"{figure_save_folder}/CoP_acceleration.png",
+                    dpi=300,
+                    pil_kwargs={"compress_level": 1},
+                    metadata={"Software": None},
+                )
+                if not show_on_screen:
+                    plt.close(fig)
+
+        if show_sensors:
+            (force_integral_r,) = pearson_r(np.array((force_data.force_integral,)), force_data.flight_times[1:])
+
+            fig_name = f"Forces ({filename})"
+            fig = force_data.plot(
+                figure=fig_name,
+                title="Sensor forces (blue) and Jump time (orange)\n"
+                f"Integral correlation = {force_integral_r:0.3f}\n",
+                x_label="Time (s)",
+                y_label="Force (N)",
+                color="blue",
+            )
+            force_data.plot_flight_times(
+                figure=fig_name,
+                y_label="Jump time (s)",
+                y_lim=[1, 2],
+                axis_on_right=True,
+                color="orange",
+            )
+            if save_figures:
+                fig.set_size_inches(16, 9)
+                fig.savefig(
+                    f"{figure_save_folder}/forces.png",
+                    dpi=300,
+                    pil_kwargs={"compress_level": 1},
+                    metadata={"Software": None},
+                )
+                if not show_on_screen:
+                    plt.close(fig)
+
+        if show_on_screen and (
+            show_cop or show_cop_displacement or show_cop_velocity or show_cop_acceleration or show_sensors
+        ):
+            Data.show()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from misc import CoPData, Data, concatenate_data
+from misc.force_sensor_data import ForceSensorData
+
+NO_DATA = 2147483647
+
+
+def _trial(flights: tuple, nb_samples: int = 200, nb_sensors: int = 2) -> Data:
+    """
+    Create a trial whose sensors have no data during each [start, end) period of flights
+    """
+
+    y = np.full((nb_samples, nb_sensors), 1000.0)
+    for start, end in flights:
+        y[start:end, :] = NO_DATA
+    return Data.from_array(np.arange(nb_samples) * 0.01, y)
+
+
+def test_convert_maps_no_data_to_nan():
+    data = Data(conversion_factor=1 / 1000)
+    converted = data.convert(np.array([[1000, NO_DATA]], dtype=np.int32))
+    np.testing.assert_array_equal(converted, [[1, np.nan]])
+
+
+def test_timings_without_flight_are_empty():
+    data = _trial(())
+    assert data.takeoffs_indices.shape == (0,)
+    assert data.landings_indices.shape == (0,)
+
+
+def test_timings_ignore_partial_flights_at_both_ends():
+    # Starting and ending in the air, the first landing and the last takeoff have no matching event
+    data = _trial(((0, 5), (10, 30), (50, 70), (190, 200)))
+    np.testing.assert_array_equal(data.takeoffs_indices, [10, 50])
+    np.testing.assert_array_equal(data.landings_indices, [30, 70])
+
+
+@pytest.mark.parametrize("data_type", (Data, CoPData, ForceSensorData))
+def test_concatenation_does_not_create_a_jump_at_the_junction(data_type):
+    first = _trial(((10, 30), (50, 70), (190, 200)))
+    second = _trial(((0, 5), (10, 30), (50, 70)))
+    if data_type is not Data:
+        first, second = data_type(first), data_type(second)
+
+    concatenated = first.concatenate(second)
+    assert type(concatenated) is data_type
+    np.testing.assert_array_equal(concatenated.takeoffs_indices, [10, 50, 210, 250])
+    np.testing.assert_array_equal(concatenated.landings_indices, [30, 70, 230, 270])
+    assert len(concatenated.flight_times) == 4
+
+
+@pytest.mark.parametrize("data_type", (Data, CoPData, ForceSensorData))
+def test_concatenate_data_matches_concatenate(data_type):
+    trials = [_trial(((10, 30), (190, 200))), _trial(((0, 5), (50, 70), (120, 130))), _trial(((20, 40),))]
+    if data_type is not Data:
+        trials = [data_type(trial) for trial in trials]
+
+    concatenated = concatenate_data(trials)
+    expected = trials[0].concatenate(trials[1]).concatenate(trials[2])
+    assert type(concatenated) is data_type
+    np.testing.assert_array_equal(concatenated.t, expected.t)
+    np.testing.assert_array_equal(concatenated.takeoffs_indices, expected.takeoffs_indices)
+    np.testing.assert_array_equal(concatenated.landings_indices, expected.landings_indices)
+    np.testing.assert_array_equal(concatenated.takeoffs_indices, [10, 250, 320, 420])
+
+
+@pytest.mark.parametrize("nb_columns", (None, 1, 2))
+def test_downsampling_keeps_the_short_gaps(nb_columns):
+    data = np.sin(np.linspace(0, 100, 100000))
+    gaps = ((1000, 1002), (50001, 50004), (99998, 100000))
+    for start, end in gaps:
+        data[start:end] = np.nan
+    if nb_columns is not None:
+        data = np.repeat(data[:, np.newaxis], nb_columns, axis=1)
+
+    idx = Data._downsample_indices(data, nb_points=1000)
+    assert len(idx) < 2000
+    np.testing.assert_array_equal(idx, np.unique(idx))
+    for start, end in gaps:
+        assert np.any((idx >= start) & (idx < end))
+
+
+@pytest.mark.parametrize("data_type", (Data, CoPData))
+def test_append_refreshes_the_cached_properties(data_type):
+    data = _trial(((10, 30),), nb_samples=50)
+    if data_type is not Data:
+        data = data_type(data)
+    np.testing.assert_allclose(data.flight_times, [0.2])
+
+    data.append_many(np.arange(50, 60) * 0.01, np.full((10, 2), NO_DATA))
+    data.append(0.6, np.ones(2))
+    np.testing.assert_allclose(data.flight_times, [0.2, 0.1])
+    assert len(data.t) == 61
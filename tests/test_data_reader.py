@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+
+from misc import DataReader
+
+
+def _write_csv(path, rows):
+    with open(path, "w") as file:
+        file.write("Time,A,B\n")
+        file.writelines(",".join(str(value) for value in row) + "\n" for row in rows)
+
+
+def test_cache_is_keyed_on_the_parse_options(tmp_path):
+    filepath = str(tmp_path / "001_R.CSV")
+    _write_csv(filepath, ((0, 1, 2), (0.01, 3, 4), (0.02, 5, 6)))
+
+    assert DataReader._read_csv(filepath, nb_sensors=1, nb_headers_rows=1).y.shape == (3, 1)
+    assert DataReader._read_csv(filepath, nb_headers_rows=1).y.shape == (3, 2)
+    np.testing.assert_array_equal(DataReader._read_csv(filepath, nb_headers_rows=2).t, [0.01, 0.02])
+
+    # Warm reads give the same tables, with a writable time vector
+    data = DataReader._read_csv(filepath, nb_headers_rows=1)
+    assert data.y.shape == (3, 2)
+    assert data.t.flags.writeable
+
+
+def test_cache_is_refreshed_when_the_file_changes(tmp_path):
+    filepath = str(tmp_path / "001_R.CSV")
+    _write_csv(filepath, ((0, 1, 2), (0.01, 3, 4)))
+    np.testing.assert_array_equal(DataReader._read_csv(filepath, nb_headers_rows=1).y, [[1, 2], [3, 4]])
+
+    _write_csv(filepath, ((0, 5, 6), (0.01, 7, 8), (0.02, 9, 10)))
+    modification_time = os.path.getmtime(filepath) + 10
+    os.utime(filepath, (modification_time, modification_time))
+    np.testing.assert_array_equal(DataReader._read_csv(filepath, nb_headers_rows=1).y, [[5, 6], [7, 8], [9, 10]])
+
+
+def test_fetch_trial_names(tmp_path):
+    for filename in ("001_CYCL.CSV", "001_R.CSV", "002_L.CSV", "001__R.CSV", "001_A_B.CSV", "003_R2.CSV", "notes.txt"):
+        (tmp_path / filename).touch()
+    (tmp_path / "004_R.CSV").mkdir()  # Only the files are trials
+
+    assert DataReader.fetch_trial_names(str(tmp_path)) == ("001", "001_", "002")
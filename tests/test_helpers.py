@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from misc.helpers import integral, segments_integral
+
+
+@pytest.mark.parametrize(
+    "starts, ends",
+    (
+        ([2, 10], [5, 11]),  # The last segment holds a single sample
+        ([0, 3, 5], [1, 5, 11]),  # The first segment holds a single sample
+        ([4], [5]),  # No segment has any trapezoid
+        ([0, 6], [4, 11]),
+    ),
+)
+def test_segments_integral_matches_integral(starts, ends):
+    t = np.linspace(0, 1, 11)
+    data = np.random.default_rng(42).random((11, 2))
+    data[7, 1] = np.nan
+    starts, ends = np.array(starts), np.array(ends)
+
+    expected = [integral(t[start:end], data[start:end, :]) for start, end in zip(starts, ends)]
+    np.testing.assert_allclose(segments_integral(t, data, starts, ends), expected, rtol=1e-6)